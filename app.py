@@ -19,16 +19,24 @@ License: MIT
 """
 
 import logging
-from flask import Flask, render_template, request, send_file
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
+from flask import Flask, Response, abort, render_template, request, send_file, url_for
 from io import BytesIO
 from typing import Tuple, Dict, Any, Optional
 from core.qr_generator import make_qr, evaluate_all_masks
-from core.renderer import render_colored_png_from_matrix, render_colored_svg_from_matrix
+from core.renderer import render_colored_png_bytes_from_matrix, render_colored_svg_from_matrix
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Defaults = receta Yape, en el orden que devuelve _read_params
+_DEFAULT_PARAMS = ("", "M", "auto", "byte", "utf-8", True, "2", False, False, 4)
+
 def _read_params(req) -> Tuple[str, str, str, str, str, bool, str, bool, bool, int]:
     """
     Extract and validate QR generation parameters from Flask request.
@@ -40,14 +48,20 @@ def _read_params(req) -> Tuple[str, str, str, str, str, bool, str, bool, bool, i
         Tuple containing: (text, ecc, version, mode, encoding, eci, mask, boost_error, micro, border)
         
     Note:
-        Defaults are optimized for Yape QR generation (ECC=M, mask=2, mode=byte)
+        Defaults are optimized for Yape QR generation (ECC=M, mask=2, mode=byte).
+        eci defaults to True for GET requests and to False for POSTs that
+        omit the field.
     """
     text = (req.values.get('text') or "").strip()
     ecc = (req.values.get('ecc') or "M").strip().upper()
     version = req.values.get('version') or "auto"
     mode = (req.values.get('mode') or "byte").strip().lower()
     encoding = (req.values.get('encoding') or "utf-8").strip()
-    eci = (req.values.get('eci') == 'true') if req.values.get('eci') is not None else True
+    # A missing eci means True on the GET export links but False on form
+    # POSTs, as the index form has always parsed it (keeps encoded bytes
+    # stable for clients that omit the field)
+    eci_default = req.method != 'POST'
+    eci = (req.values.get('eci') == 'true') if req.values.get('eci') is not None else eci_default
     mask = req.values.get('mask') or "2"
     boost_error = (req.values.get('boost_error') == 'true') if req.values.get('boost_error') is not None else False
     micro = (req.values.get('micro') == 'true') if req.values.get('micro') is not None else False
@@ -90,83 +104,197 @@ def _svg_from_matrix_rects(matrix, border=4, scale=10, light="#ffffff", dark="#0
     out.append('</svg>')
     return "\n".join(out).encode("utf-8")
 
+# Rendered preview PNGs served by /qr/<key>/<symbol_version>.png instead of
+# being inlined as base64 data URIs. Bounded LRU keyed by (params hash,
+# version) holding (png, etag); the ETag hashes the PNG itself, so renderer
+# changes invalidate browser copies even though the URL stays the same.
+_PREVIEW_CACHE_SIZE = 64
+_PREVIEW_MAX_AGE = 3600
+_preview_cache: "OrderedDict[Tuple[str, str], Tuple[bytes, str]]" = OrderedDict()
+_preview_lock = threading.Lock()
+
+def _preview_key(*params) -> str:
+    """
+    Short, URL-safe hash of the parameters that determine a preview image.
+    """
+    return blake2b(repr(params).encode('utf-8'), digest_size=8).hexdigest()
+
+def _store_preview(key: str, version: str, png: bytes) -> Tuple[bytes, str]:
+    entry = (png, blake2b(png, digest_size=8).hexdigest())
+    with _preview_lock:
+        _preview_cache[(key, version)] = entry
+        _preview_cache.move_to_end((key, version))
+        while len(_preview_cache) > _PREVIEW_CACHE_SIZE:
+            _preview_cache.popitem(last=False)
+    return entry
+
+def _load_preview(key: str, version: str) -> Optional[Tuple[bytes, str]]:
+    with _preview_lock:
+        entry = _preview_cache.get((key, version))
+        if entry is not None:
+            _preview_cache.move_to_end((key, version))
+        return entry
+
+def _preview_query(params) -> Dict[str, Any]:
+    """
+    Query arguments that make _read_params return exactly params again.
+    
+    Same format as the export links in index.html, so any worker process can
+    rebuild a preview that is not (or no longer) in its _preview_cache.
+    """
+    text, ecc, version, mode, encoding, eci, mask, boost_error, micro, border = params
+    return {
+        'text': text, 'ecc': ecc, 'version': version, 'mode': mode,
+        'encoding': encoding, 'eci': 'true' if eci else 'false', 'mask': mask,
+        'boost_error': 'true' if boost_error else 'false',
+        'micro': 'true' if micro else 'false', 'border': border,
+    }
+
+def _rebuild_preview(key: str, version: str) -> Optional[Tuple[bytes, str]]:
+    """
+    Re-render a preview from the parameters in the request's query string.
+    
+    Returns None (-> 404) unless they hash to key and yield that version.
+    """
+    params = _read_params(request)
+    if not params[0] or _preview_key(*params) != key:
+        return None
+    try:
+        qr_version, _, png, _ = _render_preview(*params)
+    except Exception as ex:
+        logger.warning(f"Preview rebuild failed: {ex}")
+        return None
+    if str(qr_version) != version:
+        return None
+    return _store_preview(key, version, png)
+
+# La vista previa se muestra a 300px CSS (.qr-img); 600px cubre pantallas 2x
+_PREVIEW_TARGET_PX = 600
+_PREVIEW_MAX_SCALE = 6
+
+def _preview_scale(size: int, border: int) -> int:
+    """
+    Smallest integer scale whose image is at least _PREVIEW_TARGET_PX wide.
+    
+    Capped at _PREVIEW_MAX_SCALE, so small symbols keep the original scale and
+    large ones stop rendering (and zlib-compressing) pixels the browser would
+    only downscale again.
+    """
+    modules = size + 2 * border
+    return max(1, min(_PREVIEW_MAX_SCALE, -(-_PREVIEW_TARGET_PX // modules)))
+
+@lru_cache(maxsize=256)
+def _render_preview(text, ecc, version, mode, encoding, eci, mask, boost_error, micro, border):
+    """
+    Encode the symbol and render its colored preview PNG (memoized).
+    
+    Identical form submissions skip both segno encoding and rendering. All
+    arguments are the hashable, already-normalized form values.
+    
+    Returns:
+        Tuple: (symbol_version, symbol_mask, png_bytes, metrics_items)
+        
+    Raises:
+        Exception: Whatever make_qr raises for unsupported parameters (not cached)
+    """
+    qr_symbol = make_qr(
+        text=text, ecc=ecc, version=version, mode=mode,
+        encoding=encoding, eci=eci, mask=mask,
+        boost_error=boost_error, micro=micro
+    )
+    logger.info(f"Successfully generated QR code version {qr_symbol.version}")
+    scale = _preview_scale(len(qr_symbol.matrix), border)
+    png, metrics = render_colored_png_bytes_from_matrix(
+        qr_symbol.matrix, qr_symbol.version, border=border, scale=scale, ecc=ecc
+    )
+    qr_mask = getattr(qr_symbol, 'mask', None if mask == 'auto' else int(mask))
+    return qr_symbol.version, qr_mask, png, tuple(metrics.items())
+
+@lru_cache(maxsize=8)
+def _render_colored_svg(text, ecc, version, mode, encoding, eci, mask, boost_error, micro, border):
+    """
+    Encode the symbol and render its colored SVG export (memoized).
+    
+    Only the last few exports are kept: a v40 SVG runs to several hundred
+    kilobytes (more with large borders), so 8 entries stay within a few MB
+    per worker.
+    
+    Returns:
+        bytes: UTF-8 encoded SVG content
+    """
+    qr = make_qr(text, ecc=ecc, version=version, mode=mode, encoding=encoding,
+                 eci=eci, mask=mask, boost_error=boost_error, micro=micro)
+    return render_colored_svg_from_matrix(
+        qr.matrix, qr.version, border=border, scale=10, ecc=ecc
+    )
+
+@lru_cache(maxsize=256)
+def _evaluate_masks(text, ecc, version, mode, encoding, eci, boost_error, micro):
+    """
+    Memoized evaluate_all_masks for the mask suggestion on the index page.
+    
+    Returns:
+        Tuple: (best_mask, best_score, scores_text)
+    """
+    best_mask, best_score, scores = evaluate_all_masks(
+        text=text, ecc=ecc, version=version, mode=mode, encoding=encoding,
+        eci=eci, boost_error=boost_error, micro=micro
+    )
+    scores_text = ", ".join(f"{k}:{v}" for k, v in sorted(scores.items()))
+    return best_mask, best_score, scores_text
+
 app = Flask(__name__, template_folder='templates')
 
+# Compila index.html una sola vez al importar: render_template lo toma luego
+# de jinja_env.cache en vez de parsearlo en la primera petición
+app.jinja_env.get_template('index.html')
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
-    # Defaults = receta Yape
-    text = ""
-    ecc = "M"
-    version = "auto"
-    mode = "byte"
-    encoding = "utf-8"
-    eci = True
-    mask = "2"
-    boost_error = False
-    micro = False
-    border = 4
+    params = _read_params(request) if request.method == 'POST' else _DEFAULT_PARAMS
+    text, ecc, version, mode, encoding, eci, mask, boost_error, micro, border = params
 
     qr_view = None
     error = None
 
     if request.method == 'POST':
-        text = (request.form.get('text') or "").strip()
-        ecc = (request.form.get('ecc') or "M").strip().upper()
-        version = request.form.get('version') or "auto"
-        mode = (request.form.get('mode') or "byte").strip().lower()
-        encoding = (request.form.get('encoding') or "utf-8").strip()
-        eci = (request.form.get('eci') == 'true')
-        mask = request.form.get('mask') or "2"
-        boost_error = (request.form.get('boost_error') == 'true')
-        micro = (request.form.get('micro') == 'true')
-        try:
-            border = int(request.form.get('border') or 4)
-        except Exception:
-            border = 4
-
         if not text:
             error = "Debes ingresar el texto raw que quieres codificar."
         else:
             try:
                 logger.info(f"Generating QR code with parameters: ecc={ecc}, version={version}, mode={mode}, mask={mask}")
-                qr_symbol = make_qr(
-                    text=text, ecc=ecc, version=version, mode=mode,
-                    encoding=encoding, eci=eci, mask=mask,
-                    boost_error=boost_error, micro=micro
-                )
-                logger.info(f"Successfully generated QR code version {qr_symbol.version}")
+                qr_version, qr_mask, png, metrics_items = _render_preview(*params)
             except Exception as ex:
                 error = f"No se pudo generar el QR con los parámetros elegidos: {ex}"
                 logger.error(f"QR generation failed: {ex}")
-                qr_symbol = None
+                qr_version = None
 
-            if qr_symbol:
-                matrix = list(qr_symbol.matrix)
-                b64, metrics = render_colored_png_from_matrix(
-                    matrix, qr_symbol.version, border=border, scale=6, ecc=ecc
-                )
+            if qr_version is not None:
+                metrics = dict(metrics_items)
+                img_key = _preview_key(*params)
+                # Versión como texto: 1-40 o 'M1'-'M4' (Micro QR)
+                _store_preview(img_key, str(qr_version), png)
 
                 # Evaluate all mask patterns for optimization suggestion
                 try:
                     logger.info("Evaluating all mask patterns for optimization")
-                    best_mask, best_score, scores = evaluate_all_masks(
-                        text=text, ecc=ecc,
-                        version=qr_symbol.version,  # Use the actual generated version
-                        mode=mode, encoding=encoding, eci=eci,
-                        boost_error=boost_error, micro=micro
+                    best_mask, best_score, scores_text = _evaluate_masks(
+                        text, ecc,
+                        qr_version,  # Use the actual generated version
+                        mode, encoding, eci, boost_error, micro
                     )
-                    scores_text = ", ".join(f"{k}:{v}" for k, v in sorted(scores.items()))
                     logger.info(f"Best mask: {best_mask} (score: {best_score})")
                 except Exception as ex:
                     logger.warning(f"Mask evaluation failed: {ex}")
                     best_mask, best_score, scores_text = "-", "-", "no disponible"
 
                 qr_view = {
-                    'version': qr_symbol.version,
+                    'version': qr_version,
                     'size': metrics['size'],
-                    'img_b64': b64,
+                    'img_url': url_for('preview_png', key=img_key, symbol_version=qr_version,
+                                       **_preview_query(params)),
                     'ecc': ecc,
-                    'mask': getattr(qr_symbol, 'mask', None if mask == 'auto' else int(mask)),
+                    'mask': qr_mask,
                     'modules': metrics['modules'],
                     'dark_modules': metrics['dark_modules'],
                     'functional_modules': metrics['functional_modules'],
@@ -189,6 +317,25 @@ def index():
         qr=qr_view, error=error
     )
 
+@app.route('/qr/<key>/<symbol_version>.png', methods=['GET'])
+def preview_png(key, symbol_version):
+    # _preview_cache es por proceso y acotado: si el PNG no está (otro
+    # worker, o ya expulsado), se regenera con los parámetros de la URL
+    entry = _load_preview(key, symbol_version) or _rebuild_preview(key, symbol_version)
+    if entry is None:
+        abort(404)
+    # El ETag es el hash del PNG, no de los parámetros: si el renderer cambia
+    # la imagen, el navegador recibe la nueva en vez de un 304 con la vieja
+    png, etag = entry
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(png, mimetype='image/png')
+    resp.cache_control.private = True
+    resp.cache_control.max_age = _PREVIEW_MAX_AGE
+    resp.set_etag(etag)
+    return resp
+
 @app.route('/export/png', methods=['GET'])
 def export_png_bw():
     text, ecc, version, mode, encoding, eci, mask, boost_error, micro, border = _read_params(request)
@@ -209,9 +356,11 @@ def export_jpg_bw():
         return "Falta texto", 400
     qr = make_qr(text, ecc=ecc, version=version, mode=mode, encoding=encoding,
                  eci=eci, mask=mask, boost_error=boost_error, micro=micro)
-    # Primero generamos PNG en memoria para conservar nitidez, luego convertimos a JPG
+    # Primero generamos PNG en memoria para conservar nitidez, luego convertimos a JPG.
+    # El PNG intermedio se decodifica enseguida: compresión mínima (zlib nivel 1)
     png_buf = BytesIO()
-    qr.save(png_buf, kind='png', scale=12, border=border, light='white', dark='black')
+    qr.save(png_buf, kind='png', scale=12, border=border, light='white', dark='black',
+            compresslevel=1)
     png_buf.seek(0)
 
     from PIL import Image
@@ -238,17 +387,17 @@ def export_svg_separate():
 
 @app.route('/export/svg-colored', methods=['GET'])
 def export_svg_colored():
-    text, ecc, version, mode, encoding, eci, mask, boost_error, micro, border = _read_params(request)
-    if not text:
+    params = _read_params(request)
+    if not params[0]:
         return "Falta texto", 400
-    qr = make_qr(text, ecc=ecc, version=version, mode=mode, encoding=encoding,
-                 eci=eci, mask=mask, boost_error=boost_error, micro=micro)
-    svg_bytes = render_colored_svg_from_matrix(
-        qr.matrix, qr.version, border=border, scale=10, ecc=ecc
-    )
+    svg_bytes = _render_colored_svg(*params)
     return send_file(BytesIO(svg_bytes), as_attachment=True,
                      download_name='qr_colored_zones.svg',
                      mimetype='image/svg+xml')
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Debug mode also turns on template auto-reload (re-stat and recompile of
+    # index.html on every render), so only enable it when explicitly asked for
+    debug = (os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true')
+             or os.environ.get('FLASK_ENV') == 'development')
+    app.run(debug=debug, port=int(os.environ.get('PORT', 5000)))
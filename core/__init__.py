@@ -16,16 +16,22 @@ __version__ = "1.0.0"
 __author__ = "QR Generator Advanced Team"
 
 from .qr_generator import make_qr, evaluate_all_masks
-from .renderer import render_colored_png_from_matrix, render_colored_svg_from_matrix
-from .functional_areas import build_function_mask, compute_alignment_centers
+from .renderer import (
+    render_colored_png_bytes_from_matrix,
+    render_colored_png_from_matrix,
+    render_colored_svg_from_matrix
+)
+from .functional_areas import build_function_mask, compute_alignment_centers, is_micro_version
 from .penalties import compute_mask_penalty
 
 __all__ = [
     'make_qr',
     'evaluate_all_masks', 
+    'render_colored_png_bytes_from_matrix',
     'render_colored_png_from_matrix',
     'render_colored_svg_from_matrix',
     'build_function_mask',
+    'is_micro_version',
     'compute_alignment_centers',
     'compute_mask_penalty'
 ]
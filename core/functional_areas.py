@@ -8,23 +8,47 @@ finder patterns, timing patterns, alignment patterns, format information,
 and version information.
 
 Functions:
+    is_micro_version: Tell Micro QR versions ('M1'-'M4') from standard ones
     compute_alignment_centers: Calculate alignment pattern center positions
     build_function_mask: Build masks for functional and separator areas
 """
 
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Tuple, Union
 
+import numpy as np
 
-def compute_alignment_centers(version: int) -> List[int]:
+
+def is_micro_version(version: Union[int, str]) -> bool:
+    """
+    Check whether a version designates a Micro QR symbol.
+    
+    segno reports Micro QR versions as strings ('M1'-'M4') and standard
+    versions as integers (1-40).
+    
+    Args:
+        version (Union[int, str]): Symbol version as reported by segno
+        
+    Returns:
+        bool: True for Micro QR versions
+        
+    Example:
+        >>> is_micro_version('M2'), is_micro_version(7)
+        (True, False)
+    """
+    return isinstance(version, str) and version.upper().startswith('M')
+
+
+def compute_alignment_centers(version: Union[int, str]) -> List[int]:
     """
     Calculate the center positions of alignment patterns for a given QR version.
     
     Alignment patterns are 5x5 modules used to correct for perspective distortion
     in QR codes. They are placed at specific positions based on the QR version.
-    Version 1 has no alignment patterns.
+    Version 1 and Micro QR symbols have no alignment patterns.
     
     Args:
-        version (int): QR code version (1-40)
+        version (Union[int, str]): QR code version (1-40, or 'M1'-'M4')
         
     Returns:
         List[int]: List of center coordinates for alignment patterns
@@ -36,7 +60,7 @@ def compute_alignment_centers(version: int) -> List[int]:
     Note:
         Algorithm based on ISO/IEC 18004:2015 section 7.3.5
     """
-    if version == 1:
+    if version == 1 or is_micro_version(version):
         return []
     
     # Calculate QR code size
@@ -52,14 +76,16 @@ def compute_alignment_centers(version: int) -> List[int]:
     if num == 2:
         return [first, last]
     
-    # Calculate intermediate positions
-    step = (last - first) / (num - 1)
-    centers = [int(round(first + i * step)) for i in range(num)]
+    # Remaining centers are spaced by an even step counted back from the last
+    # one, so the first gap absorbs any slack (e.g. v15: 6, 26, 48, 70)
+    step = (version * 8 + num * 3 + 5) // (num * 4 - 4) * 2
+    centers = [first] + [last - i * step for i in range(num - 2, -1, -1)]
     
     return centers
 
 
-def build_function_mask(size: int, version: int) -> Tuple[List[List[bool]], List[List[bool]]]:
+@lru_cache(maxsize=64)
+def build_function_mask(size: int, version: Union[int, str]) -> Tuple[np.ndarray, np.ndarray]:
     """
     Build masks identifying functional and separator areas in QR codes.
     
@@ -69,23 +95,28 @@ def build_function_mask(size: int, version: int) -> Tuple[List[List[bool]], List
     
     Args:
         size (int): QR code size in modules (21 for v1, 25 for v2, etc.)
-        version (int): QR code version (1-40)
+        version (Union[int, str]): QR code version (1-40, or 'M1'-'M4' for Micro QR)
         
     Returns:
-        Tuple[List[List[bool]], List[List[bool]]]: (func_mask, sep_mask)
-            - func_mask[r][c] = True if module (r,c) is functional
-            - sep_mask[r][c] = True if module (r,c) is in separator area
+        Tuple[np.ndarray, np.ndarray]: (func_mask, sep_mask), boolean (size, size)
+            - func_mask[r, c] = True if module (r,c) is functional
+            - sep_mask[r, c] = True if module (r,c) is in separator area
+            Both arrays are memoized per (size, version) and read-only; copy
+            them before modifying.
             
     Example:
         >>> func_mask, sep_mask = build_function_mask(21, 1)
-        >>> print(f"Functional modules: {sum(sum(row) for row in func_mask)}")
+        >>> print(f"Functional modules: {int(func_mask.sum())}")
         
     Note:
         Based on ISO/IEC 18004:2015 functional pattern specifications
     """
+    if is_micro_version(version):
+        return _build_micro_function_mask(size)
+    
     # Initialize masks
-    func_mask = [[False] * size for _ in range(size)]
-    sep_mask = [[False] * size for _ in range(size)]
+    func_mask = np.zeros((size, size), dtype=bool)
+    sep_mask = np.zeros((size, size), dtype=bool)
     
     # 1. FINDER PATTERNS (7x7 modules at 3 corners)
     # Pattern: 1111111
@@ -98,25 +129,17 @@ def build_function_mask(size: int, version: int) -> Tuple[List[List[bool]], List
     finder_positions = [(0, 0), (0, size - 7), (size - 7, 0)]
     
     for (r0, c0) in finder_positions:
-        # Mark 7x7 finder pattern as functional
-        for r in range(r0, r0 + 7):
-            for c in range(c0, c0 + 7):
-                if 0 <= r < size and 0 <= c < size:
-                    func_mask[r][c] = True
+        # Separator area (1-module border around finder), slices clip at the edge
+        sep_mask[max(r0 - 1, 0):r0 + 8, max(c0 - 1, 0):c0 + 8] = True
+        sep_mask[r0:r0 + 7, c0:c0 + 7] = False
         
-        # Mark separator area (1-module border around finder)
-        for r in range(r0 - 1, r0 + 8):
-            for c in range(c0 - 1, c0 + 8):
-                if 0 <= r < size and 0 <= c < size:
-                    # Only mark as separator if outside the 7x7 finder area
-                    if r < r0 or r > r0 + 6 or c < c0 or c > c0 + 6:
-                        sep_mask[r][c] = True
+        # Mark 7x7 finder pattern as functional
+        func_mask[r0:r0 + 7, c0:c0 + 7] = True
     
     # 2. TIMING PATTERNS (alternating pattern in row 6 and column 6)
     # These help scanners determine module size and correct for distortion
-    for i in range(size):
-        func_mask[6][i] = True  # Row 6
-        func_mask[i][6] = True  # Column 6
+    func_mask[6, :] = True  # Row 6
+    func_mask[:, 6] = True  # Column 6
     
     # 3. ALIGNMENT PATTERNS (5x5 modules, v2+)
     # Pattern: 11111
@@ -133,33 +156,60 @@ def build_function_mask(size: int, version: int) -> Tuple[List[List[bool]], List
                 continue
                 
             # Mark 5x5 alignment pattern as functional
-            for r in range(cy - 2, cy + 3):
-                for c in range(cx - 2, cx + 3):
-                    if 0 <= r < size and 0 <= c < size:
-                        func_mask[r][c] = True
+            func_mask[cy - 2:cy + 3, cx - 2:cx + 3] = True
     
     # 4. FORMAT INFORMATION (15 bits in specific positions)
     # Contains error correction level and mask pattern info
     # Positions: around top-left finder, and in timing pattern areas
-    
-    # Top-left area (around finder pattern)
-    for i in range(0, 9):
-        if i < size:
-            func_mask[8][i] = True      # Row 8, columns 0-8
-            func_mask[i][8] = True      # Column 8, rows 0-8
-            func_mask[8][size - 1 - i] = True  # Row 8, right side
+    func_mask[8, :9] = True             # Row 8, columns 0-8
+    func_mask[:9, 8] = True             # Column 8, rows 0-8
+    func_mask[8, size - 8:] = True      # Row 8, right side
+    func_mask[size - 8:, 8] = True      # Column 8, bottom (incl. dark module)
     
     # 5. VERSION INFORMATION (18 bits, v7+)
     # Contains version number for versions 7-40
     if version >= 7:
         # Two 3x6 blocks: top-right and bottom-left
-        for r in range(0, 6):
-            for c in range(size - 11, size - 8):
-                func_mask[r][c] = True
-        for r in range(size - 11, size - 8):
-            for c in range(0, 6):
-                func_mask[r][c] = True
+        func_mask[:6, size - 11:size - 8] = True
+        func_mask[size - 11:size - 8, :6] = True
+    
+    func_mask.flags.writeable = False
+    sep_mask.flags.writeable = False
+    return func_mask, sep_mask
+
+
+def _build_micro_function_mask(size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Micro QR variant of build_function_mask (11x11 for M1 up to 17x17 for M4).
+    
+    Micro QR has a single finder (top-left), timing patterns along row 0 and
+    column 0 and one 15-bit format area; there are no alignment patterns and
+    no version information.
+    
+    Args:
+        size (int): Symbol size in modules
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Read-only (func_mask, sep_mask)
+    """
+    func_mask = np.zeros((size, size), dtype=bool)
+    sep_mask = np.zeros((size, size), dtype=bool)
+    
+    # Finder pattern, separated on its right and bottom sides only
+    func_mask[:7, :7] = True
+    sep_mask[:8, :8] = True
+    sep_mask[:7, :7] = False
+    
+    # Timing patterns along the top row and the left column
+    func_mask[0, :] = True
+    func_mask[:, 0] = True
+    
+    # Format information: row 8 columns 1-8 and column 8 rows 1-7
+    func_mask[8, 1:9] = True
+    func_mask[1:8, 8] = True
     
+    func_mask.flags.writeable = False
+    sep_mask.flags.writeable = False
     return func_mask, sep_mask
 
 
@@ -15,10 +15,24 @@ Functions:
     compute_mask_penalty: Calculate total penalty score
 """
 
-from typing import List
+from typing import List, Union
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
-def penalty_N1(rows: List[List[bool]]) -> int:
+# Matrices may come as nested sequences (rows of bools/0-1 ints/bytearrays)
+# or as a 2-D ndarray
+Matrix = Union[List[List[bool]], np.ndarray]
+
+
+def _as_matrix(rows: Matrix) -> np.ndarray:
+    """
+    View a QR matrix as a 2-D boolean ndarray (no copy if it already is one).
+    """
+    return np.asarray(rows, dtype=bool)
+
+
+def penalty_N1(rows: Matrix) -> int:
     """
     Calculate penalty for adjacent modules in runs (Rule N1).
     
@@ -27,7 +41,7 @@ def penalty_N1(rows: List[List[bool]]) -> int:
     receive penalties: 3 + (run_length - 5).
     
     Args:
-        rows (List[List[bool]]): QR matrix (True=dark, False=light)
+        rows (Matrix): QR matrix (True=dark, False=light)
         
     Returns:
         int: Penalty score for rule N1
@@ -40,41 +54,31 @@ def penalty_N1(rows: List[List[bool]]) -> int:
     Note:
         Based on ISO/IEC 18004:2015 section 8.8.2, Rule N1
     """
-    score = 0
-    n = len(rows)
-    
-    # Check horizontal runs
-    for r in range(n):
-        run = 1
-        for c in range(1, n):
-            if rows[r][c] == rows[r][c-1]:
-                run += 1
-            else:
-                if run >= 5:
-                    score += 3 + (run - 5)
-                run = 1
-        # Check final run in row
-        if run >= 5:
-            score += 3 + (run - 5)
+    arr = _as_matrix(rows)
+    n = len(arr)
+    arr = arr[:n, :n]
     
-    # Check vertical runs
-    for c in range(n):
-        run = 1
-        for r in range(1, n):
-            if rows[r][c] == rows[r-1][c]:
-                run += 1
-            else:
-                if run >= 5:
-                    score += 3 + (run - 5)
-                run = 1
-        # Check final run in column
-        if run >= 5:
-            score += 3 + (run - 5)
+    # Horizontal runs, then vertical runs (same scan on the transpose)
+    return _run_penalty(arr) + _run_penalty(arr.T)
+
+
+def _run_penalty(arr: np.ndarray) -> int:
+    """
+    Sum 3 + (run - 5) over every row run of 5+ equal modules.
     
-    return score
+    Each row gets a run boundary before its first and after its last module;
+    run lengths are the gaps between consecutive boundaries of the flattened
+    array. Gaps spanning two rows are always 1 and never reach the threshold.
+    """
+    rows, cols = arr.shape
+    boundaries = np.ones((rows, cols + 1), dtype=bool)
+    np.not_equal(arr[:, 1:], arr[:, :-1], out=boundaries[:, 1:cols])
+    runs = np.diff(np.flatnonzero(boundaries))
+    long_runs = runs[runs >= 5]
+    return int(long_runs.sum() - 2 * long_runs.size)
 
 
-def penalty_N2(rows: List[List[bool]]) -> int:
+def penalty_N2(rows: Matrix) -> int:
     """
     Calculate penalty for 2x2 blocks of same color (Rule N2).
     
@@ -82,7 +86,7 @@ def penalty_N2(rows: List[List[bool]]) -> int:
     Each such block adds 3 points to the penalty score.
     
     Args:
-        rows (List[List[bool]]): QR matrix (True=dark, False=light)
+        rows (Matrix): QR matrix (True=dark, False=light)
         
     Returns:
         int: Penalty score for rule N2
@@ -95,56 +99,56 @@ def penalty_N2(rows: List[List[bool]]) -> int:
     Note:
         Based on ISO/IEC 18004:2015 section 8.8.2, Rule N2
     """
-    score = 0
-    n = len(rows)
+    arr = _as_matrix(rows)
+    n = len(arr)
+    arr = arr[:n, :n]
     
-    # Check all 2x2 blocks
-    for r in range(n - 1):
-        for c in range(n - 1):
-            value = rows[r][c]
-            # Check if all 4 modules in 2x2 block are same color
-            if (rows[r][c+1] == value and 
-                rows[r+1][c] == value and 
-                rows[r+1][c+1] == value):
-                score += 3
-    
-    return score
+    # Compare every top-left module with its 3 neighbours through slice views
+    top_left = arr[:-1, :-1]
+    same = (top_left == arr[:-1, 1:]) & (top_left == arr[1:, :-1]) & (top_left == arr[1:, 1:])
+    return 3 * int(np.count_nonzero(same))
+
 
+# 1:1:3:1:1 finder-like pattern (dark:light:dark:dark:dark:light:dark)
+_FINDER_LIKE = np.array([1, 0, 1, 1, 1, 0, 1], dtype=bool)
 
-def _pattern_1_1_3_1_1(seq: List[int]) -> List[int]:
+
+def _pattern_1_1_3_1_1(arr: np.ndarray) -> int:
     """
-    Find occurrences of pattern 1:1:3:1:1 in a sequence.
+    Count occurrences of pattern 1:1:3:1:1 along the rows of a matrix.
     
     This pattern (dark:light:dark:dark:dark:light:dark) resembles finder patterns
     and is penalized to avoid confusion with actual finder patterns.
     
     Args:
-        seq (List[int]): Binary sequence (1=dark, 0=light)
+        arr (np.ndarray): Boolean matrix (True=dark), scanned row by row
         
     Returns:
-        List[int]: List of starting indices where pattern is found
+        int: Number of pattern occurrences
         
     Note:
         Pattern must be surrounded by at least 4 light modules on either side
     """
-    indices = []
-    n = len(seq)
-    pattern = [1, 0, 1, 1, 1, 0, 1]  # 1:1:3:1:1 pattern
+    n = arr.shape[1]
+    if n < 11:
+        # No room for the pattern plus a 4-module light margin
+        return 0
+    
+    # hits[:, i]: pattern starts at column i
+    hits = (sliding_window_view(arr, 7, axis=1) == _FINDER_LIKE).all(axis=-1)
+    # light4[:, j]: columns j..j+3 are all light
+    light4 = sliding_window_view(~arr, 4, axis=1).all(axis=-1)
     
-    for i in range(n - 7 + 1):
-        if seq[i:i+7] == pattern:
-            # Check left side (at least 4 light modules)
-            left_ok = (i >= 4 and all(v == 0 for v in seq[i-4:i]))
-            # Check right side (at least 4 light modules)  
-            right_ok = (i+7 <= n-4 and all(v == 0 for v in seq[i+7:i+11]))
-            
-            if left_ok or right_ok:
-                indices.append(i)
+    # Check left side (at least 4 light modules before i, so i >= 4)
+    margin = np.zeros_like(hits)
+    margin[:, 4:] = light4[:, :n - 10]
+    # Check right side (at least 4 light modules after i + 6, so i <= n - 11)
+    margin[:, :n - 10] |= light4[:, 7:]
     
-    return indices
+    return int(np.count_nonzero(hits & margin))
 
 
-def penalty_N3(rows: List[List[bool]]) -> int:
+def penalty_N3(rows: Matrix) -> int:
     """
     Calculate penalty for finder-like patterns (Rule N3).
     
@@ -152,7 +156,7 @@ def penalty_N3(rows: List[List[bool]]) -> int:
     to avoid confusion with actual finder patterns. Each occurrence adds 40 points.
     
     Args:
-        rows (List[List[bool]]): QR matrix (True=dark, False=light)
+        rows (Matrix): QR matrix (True=dark, False=light)
         
     Returns:
         int: Penalty score for rule N3
@@ -166,23 +170,15 @@ def penalty_N3(rows: List[List[bool]]) -> int:
     Note:
         Based on ISO/IEC 18004:2015 section 8.8.2, Rule N3
     """
-    score = 0
-    n = len(rows)
-    
-    # Check horizontal patterns
-    for r in range(n):
-        row = [1 if rows[r][c] else 0 for c in range(n)]
-        score += 40 * len(_pattern_1_1_3_1_1(row))
-    
-    # Check vertical patterns
-    for c in range(n):
-        col = [1 if rows[r][c] else 0 for r in range(n)]
-        score += 40 * len(_pattern_1_1_3_1_1(col))
+    arr = _as_matrix(rows)
+    n = len(arr)
+    arr = arr[:n, :n]
     
-    return score
+    # Horizontal patterns, then vertical patterns
+    return 40 * (_pattern_1_1_3_1_1(arr) + _pattern_1_1_3_1_1(arr.T))
 
 
-def penalty_N4(rows: List[List[bool]]) -> int:
+def penalty_N4(rows: Matrix) -> int:
     """
     Calculate penalty for dark/light module ratio (Rule N4).
     
@@ -191,7 +187,7 @@ def penalty_N4(rows: List[List[bool]]) -> int:
     10 * floor(abs(ratio - 50) / 5)
     
     Args:
-        rows (List[List[bool]]): QR matrix (True=dark, False=light)
+        rows (Matrix): QR matrix (True=dark, False=light)
         
     Returns:
         int: Penalty score for rule N4
@@ -205,9 +201,10 @@ def penalty_N4(rows: List[List[bool]]) -> int:
     Note:
         Based on ISO/IEC 18004:2015 section 8.8.2, Rule N4
     """
-    n = len(rows)
+    arr = _as_matrix(rows)
+    n = len(arr)
     total = n * n
-    dark = sum(1 for r in range(n) for c in range(n) if rows[r][c])
+    dark = int(np.count_nonzero(arr[:n, :n]))
     
     # Calculate percentage of dark modules
     ratio = dark * 100.0 / total
@@ -217,7 +214,7 @@ def penalty_N4(rows: List[List[bool]]) -> int:
     return k * 10
 
 
-def compute_mask_penalty(matrix_bool: List[List[bool]]) -> int:
+def compute_mask_penalty(matrix_bool: Matrix) -> int:
     """
     Calculate total mask penalty score for a QR code matrix.
     
@@ -226,7 +223,8 @@ def compute_mask_penalty(matrix_bool: List[List[bool]]) -> int:
     Lower scores indicate better visual quality and easier scanning.
     
     Args:
-        matrix_bool (List[List[bool]]): QR matrix (True=dark, False=light)
+        matrix_bool (Matrix): QR matrix (True=dark, False=light), nested
+            sequences or a 2-D ndarray
         
     Returns:
         int: Total penalty score (lower is better)
@@ -240,14 +238,14 @@ def compute_mask_penalty(matrix_bool: List[List[bool]]) -> int:
         Based on ISO/IEC 18004:2015 section 8.8.2
         The mask with the lowest total penalty should be selected
     """
-    # Convert to boolean matrix if needed
-    rows = [[bool(v) for v in row] for row in matrix_bool]
+    # Convert to a boolean array once; every rule works on views of it
+    arr = _as_matrix(matrix_bool)
     
     # Calculate all penalty components
-    n1_score = penalty_N1(rows)
-    n2_score = penalty_N2(rows)
-    n3_score = penalty_N3(rows)
-    n4_score = penalty_N4(rows)
+    n1_score = penalty_N1(arr)
+    n2_score = penalty_N2(arr)
+    n3_score = penalty_N3(arr)
+    n4_score = penalty_N4(arr)
     
     # Return total penalty
     return n1_score + n2_score + n3_score + n4_score
@@ -11,11 +11,79 @@ Functions:
     evaluate_all_masks: Evaluate all mask patterns to find optimal one
 """
 
+import multiprocessing
+import os
+import threading
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
 import segno
 from typing import Optional, Union, Tuple, Dict, Any
+from .functional_areas import build_function_mask, is_micro_version
 from .penalties import compute_mask_penalty
 
 
+# Worker pool for mask evaluation, created on first use. Encoding and penalty
+# scoring are pure Python, so processes (not threads) are needed to use more
+# than one core. Workers are started by forkserver/spawn, which re-import the
+# entry module: scripts that call evaluate_all_masks at import time must do so
+# under ``if __name__ == "__main__":`` (WSGI servers and app.py already do),
+# otherwise the pool fails to start and scoring falls back to serial.
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Symbols smaller than this (modules per side, v20) are scored serially:
+# below it the pool round trip costs more than the 8 scorings it spreads out
+_PARALLEL_MIN_SIZE = 97
+
+
+def _pool_context():
+    """
+    Start method for the pool workers.
+    
+    The pool is created (and its workers replaced) from inside threaded WSGI
+    servers, where fork() can copy locks held by other threads into the child
+    and deadlock it; a forkserver (or spawn where unavailable) starts workers
+    from a clean single-threaded process instead.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('forkserver')
+        # Import this module once in the server so each worker starts warm
+        ctx.set_forkserver_preload([__name__])
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    """
+    Return the shared mask-evaluation process pool, or None on single-core hosts.
+    """
+    global _executor
+    workers = min(8, os.cpu_count() or 1)
+    if workers <= 1:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Forget a broken pool so that _get_executor creates a fresh one.
+    
+    Waits for the (already dead or exiting) workers so their semaphores and
+    pipes are released instead of leaking until interpreter shutdown.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
 def make_qr(
     text: str,
     ecc: str = 'M',
@@ -44,6 +112,7 @@ def make_qr(
         version (Optional[Union[int, str]]): QR code version (1-40) or 'auto'
             - 'auto': Select minimum version that fits the data
             - int: Force specific version (1=21x21, 40=177x177)
+            - 'M1'-'M4': Force a Micro QR version
         mode (str): Encoding mode
             - 'byte': Any binary data/UTF-8 (recommended, Yape uses this)
             - 'alphanumeric': A-Z, 0-9, and few symbols (more compact)
@@ -60,7 +129,8 @@ def make_qr(
         micro (bool): Use Micro QR format (M1-M4) instead of standard QR
         
     Returns:
-        segno.QRCode: Generated QR code object
+        segno.QRCode: Generated QR code object (memoized per parameter set;
+            do not modify it)
         
     Raises:
         ValueError: If parameters are invalid
@@ -75,21 +145,53 @@ def make_qr(
         >>> qr = make_qr("https://example.com", ecc='M', version='auto', mask='auto')
     """
     # Convert mask parameter: 'auto' -> None, otherwise int
-    mask_arg = None if mask == 'auto' else int(mask)
+    mask_arg = None if mask in (None, 'auto') else int(mask)
+    
+    # Convert version parameter: 'auto' or None -> None, Micro QR 'M1'-'M4' as is,
+    # otherwise int
+    if version in (None, 'auto'):
+        ver_arg = None
+    elif is_micro_version(version):
+        ver_arg = version.upper()
+    else:
+        ver_arg = int(version)
     
-    # Convert version parameter: 'auto' or None -> None, otherwise int
-    ver_arg = None if (version in (None, 'auto')) else int(version)
+    return _make_qr_cached(
+        text, ecc, ver_arg, mode, encoding, bool(eci), mask_arg,
+        bool(boost_error), bool(micro)
+    )
+
+
+@lru_cache(maxsize=256)
+def _make_qr_cached(
+    text: str,
+    ecc: str,
+    version: Optional[Union[int, str]],
+    mode: str,
+    encoding: str,
+    eci: bool,
+    mask: Optional[int],
+    boost_error: bool,
+    micro: bool
+) -> segno.QRCode:
+    """
+    Memoized segno.make on normalized make_qr arguments.
     
+    Identical parameters yield identical symbols, so repeated requests (and
+    the version-fixed re-encode in evaluate_all_masks) skip data encoding and
+    Reed-Solomon entirely. Returned symbols are shared: treat them as
+    read-only. Failures are not cached.
+    """
     return segno.make(
         text,
         error=ecc,
-        version=ver_arg,
+        version=version,
         mode=mode,
         encoding=encoding,
-        eci=bool(eci),
-        mask=mask_arg,
-        boost_error=bool(boost_error),
-        micro=bool(micro)
+        eci=eci,
+        mask=mask,
+        boost_error=boost_error,
+        micro=micro
     )
 
 
@@ -110,6 +212,10 @@ def evaluate_all_masks(
     calculates their penalty scores according to ISO/IEC 18004 standard.
     The mask with the lowest penalty score is considered optimal.
     
+    Standard symbols are encoded only once; the other masks are derived by
+    XOR over the data region (see _masked_matrices). Micro QR symbols are
+    encoded once per mask.
+    
     Args:
         text (str): The data to encode
         ecc (str): Error correction level ('L', 'M', 'Q', 'H')
@@ -122,9 +228,10 @@ def evaluate_all_masks(
         
     Returns:
         Tuple[int, int, Dict[int, int]]: (best_mask, best_score, all_scores)
-            - best_mask: Mask pattern with lowest penalty (0-7)
-            - best_score: Penalty score of the best mask
-            - all_scores: Dictionary mapping mask -> penalty score
+            - best_mask: Mask pattern with lowest penalty (0-7); for Micro QR
+              the pattern (0-3) with the highest evaluation score
+            - best_score: Penalty (or Micro QR evaluation) score of the best mask
+            - all_scores: Dictionary mapping mask -> score
             
     Example:
         >>> best_mask, best_score, scores = evaluate_all_masks(
@@ -134,33 +241,235 @@ def evaluate_all_masks(
         >>> print(f"Best mask: {best_mask} (score: {best_score})")
         >>> print(f"All scores: {scores}")
     """
-    scores = {}
-    best_mask = None
-    best_score = None
-    
-    # Evaluate each mask pattern (0-7)
-    for mask_pattern in range(8):
+    if micro:
+        # Micro QR has only masks 0-3 and its own format layout: encode each
+        jobs = [
+            (text, ecc, version, mode, encoding, eci, mask_pattern, boost_error, micro)
+            for mask_pattern in range(4)
+        ]
+        results = _parallel_map(_score_mask, jobs, size=17)  # Micro QR: at most 17x17
+    else:
+        # Encode once, derive the 8 masked symbols by XOR (see _masked_matrices)
         try:
-            # Generate QR code with specific mask
             symbol = make_qr(
                 text, ecc=ecc, version=version, mode=mode,
-                encoding=encoding, eci=eci, mask=mask_pattern,
+                encoding=encoding, eci=eci, mask=0,
                 boost_error=boost_error, micro=micro
             )
-            
-            # Convert matrix to list format for penalty calculation
-            matrix = list(symbol.matrix)
-            penalty_score = compute_mask_penalty(matrix)
-            
-            scores[mask_pattern] = penalty_score
-            
-            # Track the best (lowest penalty) mask
-            if best_score is None or penalty_score < best_score:
-                best_score = penalty_score
-                best_mask = mask_pattern
-                
         except Exception:
-            # If a mask fails, assign high penalty
-            scores[mask_pattern] = 999999
+            symbol = None
+        if symbol is None:
+            results = [None] * 8
+        else:
+            matrices = _masked_matrices(symbol)
+            results = _parallel_map(compute_mask_penalty, matrices, size=len(symbol.matrix))
+    
+    scores = {}
+    best_mask = None
+    best_score = None
+    
+    for mask_pattern, penalty_score in enumerate(results):
+        if penalty_score is None:
+            # If a mask fails, assign the worst possible score
+            scores[mask_pattern] = -1 if micro else 999999
+            continue
+        
+        scores[mask_pattern] = penalty_score
+        
+        # Track the best mask: lowest penalty, or highest Micro QR score
+        if best_score is None or (penalty_score > best_score if micro else penalty_score < best_score):
+            best_score = penalty_score
+            best_mask = mask_pattern
     
     return best_mask, best_score, scores
+
+
+def _micro_mask_score(matrix: np.ndarray) -> int:
+    """
+    Evaluation score of a masked Micro QR symbol (higher is better).
+    
+    ISO/IEC 18004:2015 section 7.8.3.2: SUM1 and SUM2 count the dark modules
+    of the right and bottom edges (timing modules excluded); the score is
+    16 * min(SUM1, SUM2) + max(SUM1, SUM2).
+    
+    Args:
+        matrix (np.ndarray): Micro QR matrix (nonzero=dark)
+        
+    Returns:
+        int: Evaluation score
+    """
+    sum1 = int(np.count_nonzero(matrix[1:, -1]))
+    sum2 = int(np.count_nonzero(matrix[-1, 1:]))
+    return 16 * min(sum1, sum2) + max(sum1, sum2)
+
+
+def _score_mask(job: Tuple) -> Optional[int]:
+    """
+    Encode the symbol with one mask pattern and return its score.
+    
+    Module-level so it can be pickled into worker processes.
+    
+    Args:
+        job (Tuple): (text, ecc, version, mode, encoding, eci, mask, boost_error, micro)
+        
+    Returns:
+        Optional[int]: Penalty score (Micro QR: evaluation score), or None if
+        the symbol could not be generated
+    """
+    text, ecc, version, mode, encoding, eci, mask_pattern, boost_error, micro = job
+    try:
+        # Generate QR code with specific mask
+        symbol = make_qr(
+            text, ecc=ecc, version=version, mode=mode,
+            encoding=encoding, eci=eci, mask=mask_pattern,
+            boost_error=boost_error, micro=micro
+        )
+        
+        # One contiguous uint8 array straight from segno's row buffers
+        rows = symbol.matrix
+        matrix = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(len(rows), -1)
+        return _micro_mask_score(matrix) if micro else compute_mask_penalty(matrix)
+    except Exception:
+        return None
+
+
+def _parallel_map(fn, items, size: int) -> list:
+    """
+    Map fn over items in the shared process pool, or serially without one.
+    
+    Symbols below _PARALLEL_MIN_SIZE modules per side are always scored
+    serially.
+    """
+    executor = _get_executor() if size >= _PARALLEL_MIN_SIZE else None
+    if executor is None:
+        return list(map(fn, items))
+    try:
+        return list(executor.map(fn, items))
+    except (BrokenProcessPool, RuntimeError, OSError):
+        # A dead worker poisons the pool, and workers cannot start while the
+        # process is still bootstrapping (unguarded entry module): drop the
+        # pool so the next call recreates it, and score serially instead
+        _discard_executor(executor)
+        return list(map(fn, items))
+
+
+# Format information: 2-bit ECC level indicator (ISO/IEC 18004:2015 table 12)
+_ECC_FORMAT_BITS = {'L': 0b01, 'M': 0b00, 'Q': 0b11, 'H': 0b10}
+
+
+def _format_bits(ecc: str, mask: int) -> int:
+    """
+    Compute the 15-bit format information word for an ECC level and mask.
+    
+    BCH(15,5) code with generator 0x537, XOR-ed with the 0x5412 mask pattern.
+    
+    Args:
+        ecc (str): Error correction level ('L', 'M', 'Q', 'H')
+        mask (int): Mask pattern (0-7)
+        
+    Returns:
+        int: 15-bit format word (bit 14 first)
+    """
+    data = (_ECC_FORMAT_BITS[ecc.upper()] << 3) | mask
+    rem = data
+    for _ in range(10):
+        rem = (rem << 1) ^ ((rem >> 9) * 0x537)
+    return ((data << 10) | (rem & 0x3FF)) ^ 0x5412
+
+
+# All 32 format words, unpacked once and tiled for both copies (bit 0-14, twice)
+_FORMAT_WORD_BITS = {
+    (ecc, mask): np.tile(
+        np.array([(_format_bits(ecc, mask) >> i) & 1 for i in range(15)], dtype=np.uint8), 2
+    )
+    for ecc in _ECC_FORMAT_BITS for mask in range(8)
+}
+
+
+def _format_positions(size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Module coordinates of both format information copies, indexed by bit 0-14.
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (rows, cols) of copy 1 followed by copy 2,
+        matching the layout of _FORMAT_WORD_BITS
+    """
+    # Copy 1 wraps around the top-left finder
+    rows1 = [0, 1, 2, 3, 4, 5, 7, 8, 8, 8, 8, 8, 8, 8, 8]
+    cols1 = [8, 8, 8, 8, 8, 8, 8, 8, 7, 5, 4, 3, 2, 1, 0]
+    # Copy 2 is split between the top-right and bottom-left finders
+    rows2 = [8] * 8 + [size - 7 + i for i in range(7)]
+    cols2 = [size - 1 - i for i in range(8)] + [8] * 7
+    return np.array(rows1 + rows2), np.array(cols1 + cols2)
+
+
+def _reserved_mask(size: int, version: int) -> np.ndarray:
+    """
+    Boolean mask of every module excluded from data masking.
+    
+    The function patterns, format/version areas and dark module come from
+    build_function_mask (the single source of the symbol layout); the finder
+    separators, which it keeps apart for coloring, are added back.
+    """
+    func, sep = build_function_mask(size, version)
+    return func | sep
+
+
+def _mask_patterns(size: int) -> np.ndarray:
+    """
+    All 8 data mask patterns as a (8, size, size) boolean array (i=row, j=col).
+    """
+    i, j = np.indices((size, size))
+    return np.stack([
+        (i + j) % 2 == 0,
+        i % 2 == 0,
+        j % 3 == 0,
+        (i + j) % 3 == 0,
+        (i // 2 + j // 3) % 2 == 0,
+        (i * j) % 2 + (i * j) % 3 == 0,
+        ((i * j) % 2 + (i * j) % 3) % 2 == 0,
+        ((i + j) % 2 + (i * j) % 3) % 2 == 0,
+    ])
+
+
+@lru_cache(maxsize=64)
+def _data_mask_patterns(size: int, version: int) -> np.ndarray:
+    """
+    The 8 mask patterns restricted to the data region, memoized per version.
+    
+    Returns:
+        np.ndarray: Read-only (8, size, size) boolean array
+    """
+    patterns = _mask_patterns(size) & ~_reserved_mask(size, version)
+    patterns.flags.writeable = False
+    return patterns
+
+
+def _masked_matrices(symbol: segno.QRCode) -> list:
+    """
+    Derive the symbol matrix for every mask pattern from a single encoding.
+    
+    The data and ECC codewords (and their placement) do not depend on the
+    mask, so re-running segno per mask is unnecessary: strip the symbol's own
+    mask, XOR each pattern over the data region and rewrite the format bits.
+    
+    Args:
+        symbol (segno.QRCode): Standard (non-micro) QR code encoded with any mask
+        
+    Returns:
+        list: 8 uint8 arrays (size, size), index = mask pattern
+    """
+    rows = symbol.matrix
+    size = len(rows)
+    base = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(size, size)
+    patterns = _data_mask_patterns(size, symbol.version)
+    unmasked = base ^ patterns[symbol.mask]
+    fmt_rows, fmt_cols = _format_positions(size)
+    ecc = symbol.error.upper()
+    
+    matrices = []
+    for mask_pattern in range(8):
+        matrix = unmasked ^ patterns[mask_pattern]
+        matrix[fmt_rows, fmt_cols] = _FORMAT_WORD_BITS[(ecc, mask_pattern)]
+        matrices.append(matrix)
+    return matrices
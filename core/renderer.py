@@ -7,15 +7,22 @@ coloring and analysis features. It can generate both PNG and SVG outputs with
 detailed zone-based coloring to help understand QR code structure.
 
 Functions:
-    render_colored_png_from_matrix: Generate colored PNG with zone analysis
+    render_colored_png_bytes_from_matrix: Generate colored PNG bytes with zone analysis
+    render_colored_png_from_matrix: Generate colored PNG (base64) with zone analysis
     render_colored_svg_from_matrix: Generate colored SVG with zone analysis
 """
 
-from io import BytesIO
-from PIL import Image, ImageDraw
+from functools import lru_cache
 import base64
+import io
+import struct
+import zlib
+import numpy as np
 from typing import List, Tuple, Dict, Any, Union
-from .functional_areas import build_function_mask, compute_alignment_centers
+from .functional_areas import build_function_mask, compute_alignment_centers, is_micro_version
+
+# A QR matrix: rows of 0/1 values (segno's bytearrays, lists) or a 2-D ndarray
+Matrix = Union[List[List[bool]], np.ndarray]
 
 
 # Color palette for QR code zone visualization
@@ -31,72 +38,99 @@ PALETTE = {
     'ecc': (20, 90, 160),             # Blue - Error correction codes
 }
 
+# Zone codes used by the vectorized renderer (index into _ZONE_NAMES,
+# _PALETTE_LUT and the palette of the generated PNG)
+(_ZONE_BACKGROUND, _ZONE_SEPARATOR, _ZONE_FINDER, _ZONE_ALIGNMENT, _ZONE_TIMING,
+ _ZONE_FORMAT, _ZONE_VERSION, _ZONE_DATA, _ZONE_ECC) = range(9)
+
+_ZONE_NAMES = (
+    'background', 'separator', 'finder', 'alignment', 'timing',
+    'format', 'version', 'data', 'ecc',
+)
+
+_PALETTE_LUT = np.array([PALETTE[name] for name in _ZONE_NAMES], dtype=np.uint8)
+
+# SVG fill strings per zone code, e.g. 'rgb(255, 0, 0)'
+_SVG_FILLS = tuple(f'rgb{PALETTE[name]}' for name in _ZONE_NAMES)
+
 # ECC codewords per block for all levels and versions (ISO/IEC 18004:2015)
 # Format: (version, ecc_level) -> (g1_blocks, ecc_per_block_g1, g2_blocks, ecc_per_block_g2)
 _ECC_TABLE = {
     # Level L (7% recovery)
-    (1, 'L'): (1, 7, 0, 0), (2, 'L'): (1, 10, 1, 10), (3, 'L'): (1, 15, 1, 15),
-    (4, 'L'): (1, 20, 1, 20), (5, 'L'): (1, 26, 1, 26), (6, 'L'): (2, 18, 2, 18),
-    (7, 'L'): (2, 20, 2, 20), (8, 'L'): (2, 24, 2, 24), (9, 'L'): (2, 30, 2, 30),
-    (10, 'L'): (2, 18, 4, 18), (11, 'L'): (4, 20, 2, 20), (12, 'L'): (4, 24, 2, 24),
-    (13, 'L'): (4, 26, 2, 26), (14, 'L'): (4, 30, 2, 30), (15, 'L'): (6, 22, 2, 22),
-    (16, 'L'): (6, 24, 2, 24), (17, 'L'): (6, 28, 2, 28), (18, 'L'): (6, 30, 2, 30),
-    (19, 'L'): (6, 28, 4, 28), (20, 'L'): (6, 28, 4, 28), (21, 'L'): (6, 28, 4, 28),
-    (22, 'L'): (6, 28, 4, 28), (23, 'L'): (6, 28, 4, 28), (24, 'L'): (6, 28, 4, 28),
-    (25, 'L'): (6, 28, 4, 28), (26, 'L'): (6, 28, 4, 28), (27, 'L'): (6, 28, 4, 28),
-    (28, 'L'): (6, 28, 4, 28), (29, 'L'): (6, 28, 4, 28), (30, 'L'): (6, 28, 4, 28),
-    (31, 'L'): (6, 28, 4, 28), (32, 'L'): (6, 28, 4, 28), (33, 'L'): (6, 28, 4, 28),
-    (34, 'L'): (6, 28, 4, 28), (35, 'L'): (6, 28, 4, 28), (36, 'L'): (6, 28, 4, 28),
-    (37, 'L'): (6, 28, 4, 28), (38, 'L'): (6, 28, 4, 28), (39, 'L'): (6, 28, 4, 28),
-    (40, 'L'): (6, 28, 4, 28),
+    (1, 'L'): (1, 7, 0, 0), (2, 'L'): (1, 10, 0, 0), (3, 'L'): (1, 15, 0, 0),
+    (4, 'L'): (1, 20, 0, 0), (5, 'L'): (1, 26, 0, 0), (6, 'L'): (2, 18, 0, 0),
+    (7, 'L'): (2, 20, 0, 0), (8, 'L'): (2, 24, 0, 0), (9, 'L'): (2, 30, 0, 0),
+    (10, 'L'): (2, 18, 2, 18), (11, 'L'): (4, 20, 0, 0), (12, 'L'): (2, 24, 2, 24),
+    (13, 'L'): (4, 26, 0, 0), (14, 'L'): (3, 30, 1, 30), (15, 'L'): (5, 22, 1, 22),
+    (16, 'L'): (5, 24, 1, 24), (17, 'L'): (1, 28, 5, 28), (18, 'L'): (5, 30, 1, 30),
+    (19, 'L'): (3, 28, 4, 28), (20, 'L'): (3, 28, 5, 28), (21, 'L'): (4, 28, 4, 28),
+    (22, 'L'): (2, 28, 7, 28), (23, 'L'): (4, 30, 5, 30), (24, 'L'): (6, 30, 4, 30),
+    (25, 'L'): (8, 26, 4, 26), (26, 'L'): (10, 28, 2, 28), (27, 'L'): (8, 30, 4, 30),
+    (28, 'L'): (3, 30, 10, 30), (29, 'L'): (7, 30, 7, 30), (30, 'L'): (5, 30, 10, 30),
+    (31, 'L'): (13, 30, 3, 30), (32, 'L'): (17, 30, 0, 0), (33, 'L'): (17, 30, 1, 30),
+    (34, 'L'): (13, 30, 6, 30), (35, 'L'): (12, 30, 7, 30), (36, 'L'): (6, 30, 14, 30),
+    (37, 'L'): (17, 30, 4, 30), (38, 'L'): (4, 30, 18, 30), (39, 'L'): (20, 30, 4, 30),
+    (40, 'L'): (19, 30, 6, 30),
     
     # Level M (15% recovery) - Yape uses this
-    (1, 'M'): (1, 10, 0, 0), (2, 'M'): (1, 16, 1, 16), (3, 'M'): (1, 26, 1, 26),
-    (4, 'M'): (2, 18, 2, 18), (5, 'M'): (2, 24, 2, 24), (6, 'M'): (4, 16, 4, 16),
-    (7, 'M'): (2, 18, 4, 18), (8, 'M'): (4, 22, 2, 22), (9, 'M'): (4, 20, 4, 20),
-    (10, 'M'): (2, 24, 6, 24), (11, 'M'): (4, 28, 2, 28), (12, 'M'): (4, 26, 4, 26),
-    (13, 'M'): (4, 24, 4, 24), (14, 'M'): (4, 20, 4, 20), (15, 'M'): (6, 24, 2, 24),
-    (16, 'M'): (6, 28, 2, 28), (17, 'M'): (6, 24, 4, 24), (18, 'M'): (6, 28, 4, 28),
-    (19, 'M'): (6, 26, 4, 26), (20, 'M'): (6, 30, 4, 30), (21, 'M'): (6, 28, 4, 28),
-    (22, 'M'): (6, 30, 4, 30), (23, 'M'): (6, 30, 4, 30), (24, 'M'): (6, 30, 4, 30),
-    (25, 'M'): (6, 30, 4, 30), (26, 'M'): (6, 30, 4, 30), (27, 'M'): (6, 30, 4, 30),
-    (28, 'M'): (6, 30, 4, 30), (29, 'M'): (6, 30, 4, 30), (30, 'M'): (6, 30, 4, 30),
-    (31, 'M'): (6, 30, 4, 30), (32, 'M'): (6, 30, 4, 30), (33, 'M'): (6, 30, 4, 30),
-    (34, 'M'): (6, 30, 4, 30), (35, 'M'): (6, 30, 4, 30), (36, 'M'): (6, 30, 4, 30),
-    (37, 'M'): (6, 30, 4, 30), (38, 'M'): (6, 30, 4, 30), (39, 'M'): (6, 30, 4, 30),
-    (40, 'M'): (6, 30, 4, 30),
+    (1, 'M'): (1, 10, 0, 0), (2, 'M'): (1, 16, 0, 0), (3, 'M'): (1, 26, 0, 0),
+    (4, 'M'): (2, 18, 0, 0), (5, 'M'): (2, 24, 0, 0), (6, 'M'): (4, 16, 0, 0),
+    (7, 'M'): (4, 18, 0, 0), (8, 'M'): (2, 22, 2, 22), (9, 'M'): (3, 22, 2, 22),
+    (10, 'M'): (4, 26, 1, 26), (11, 'M'): (1, 30, 4, 30), (12, 'M'): (6, 22, 2, 22),
+    (13, 'M'): (8, 22, 1, 22), (14, 'M'): (4, 24, 5, 24), (15, 'M'): (5, 24, 5, 24),
+    (16, 'M'): (7, 28, 3, 28), (17, 'M'): (10, 28, 1, 28), (18, 'M'): (9, 26, 4, 26),
+    (19, 'M'): (3, 26, 11, 26), (20, 'M'): (3, 26, 13, 26), (21, 'M'): (17, 26, 0, 0),
+    (22, 'M'): (17, 28, 0, 0), (23, 'M'): (4, 28, 14, 28), (24, 'M'): (6, 28, 14, 28),
+    (25, 'M'): (8, 28, 13, 28), (26, 'M'): (19, 28, 4, 28), (27, 'M'): (22, 28, 3, 28),
+    (28, 'M'): (3, 28, 23, 28), (29, 'M'): (21, 28, 7, 28), (30, 'M'): (19, 28, 10, 28),
+    (31, 'M'): (2, 28, 29, 28), (32, 'M'): (10, 28, 23, 28), (33, 'M'): (14, 28, 21, 28),
+    (34, 'M'): (14, 28, 23, 28), (35, 'M'): (12, 28, 26, 28), (36, 'M'): (6, 28, 34, 28),
+    (37, 'M'): (29, 28, 14, 28), (38, 'M'): (13, 28, 32, 28), (39, 'M'): (40, 28, 7, 28),
+    (40, 'M'): (18, 28, 31, 28),
     
     # Level Q (25% recovery)
-    (1, 'Q'): (1, 13, 0, 0), (2, 'Q'): (1, 22, 1, 22), (3, 'Q'): (2, 18, 2, 18),
-    (4, 'Q'): (2, 26, 2, 26), (5, 'Q'): (2, 18, 2, 18), (6, 'Q'): (4, 24, 4, 24),
-    (7, 'Q'): (4, 18, 2, 18), (8, 'Q'): (4, 22, 2, 22), (9, 'Q'): (4, 20, 2, 20),
-    (10, 'Q'): (4, 24, 2, 24), (11, 'Q'): (4, 28, 2, 28), (12, 'Q'): (4, 26, 2, 26),
-    (13, 'Q'): (4, 24, 2, 24), (14, 'Q'): (4, 20, 2, 20), (15, 'Q'): (6, 24, 2, 24),
-    (16, 'Q'): (6, 28, 2, 28), (17, 'Q'): (6, 24, 2, 24), (18, 'Q'): (6, 28, 2, 28),
-    (19, 'Q'): (6, 26, 2, 26), (20, 'Q'): (6, 30, 2, 30), (21, 'Q'): (6, 28, 2, 28),
-    (22, 'Q'): (6, 30, 2, 30), (23, 'Q'): (6, 30, 2, 30), (24, 'Q'): (6, 30, 2, 30),
-    (25, 'Q'): (6, 30, 2, 30), (26, 'Q'): (6, 30, 2, 30), (27, 'Q'): (6, 30, 2, 30),
-    (28, 'Q'): (6, 30, 2, 30), (29, 'Q'): (6, 30, 2, 30), (30, 'Q'): (6, 30, 2, 30),
-    (31, 'Q'): (6, 30, 2, 30), (32, 'Q'): (6, 30, 2, 30), (33, 'Q'): (6, 30, 2, 30),
-    (34, 'Q'): (6, 30, 2, 30), (35, 'Q'): (6, 30, 2, 30), (36, 'Q'): (6, 30, 2, 30),
-    (37, 'Q'): (6, 30, 2, 30), (38, 'Q'): (6, 30, 2, 30), (39, 'Q'): (6, 30, 2, 30),
-    (40, 'Q'): (6, 30, 2, 30),
+    (1, 'Q'): (1, 13, 0, 0), (2, 'Q'): (1, 22, 0, 0), (3, 'Q'): (2, 18, 0, 0),
+    (4, 'Q'): (2, 26, 0, 0), (5, 'Q'): (2, 18, 2, 18), (6, 'Q'): (4, 24, 0, 0),
+    (7, 'Q'): (2, 18, 4, 18), (8, 'Q'): (4, 22, 2, 22), (9, 'Q'): (4, 20, 4, 20),
+    (10, 'Q'): (6, 24, 2, 24), (11, 'Q'): (4, 28, 4, 28), (12, 'Q'): (4, 26, 6, 26),
+    (13, 'Q'): (8, 24, 4, 24), (14, 'Q'): (11, 20, 5, 20), (15, 'Q'): (5, 30, 7, 30),
+    (16, 'Q'): (15, 24, 2, 24), (17, 'Q'): (1, 28, 15, 28), (18, 'Q'): (17, 28, 1, 28),
+    (19, 'Q'): (17, 26, 4, 26), (20, 'Q'): (15, 30, 5, 30), (21, 'Q'): (17, 28, 6, 28),
+    (22, 'Q'): (7, 30, 16, 30), (23, 'Q'): (11, 30, 14, 30), (24, 'Q'): (11, 30, 16, 30),
+    (25, 'Q'): (7, 30, 22, 30), (26, 'Q'): (28, 28, 6, 28), (27, 'Q'): (8, 30, 26, 30),
+    (28, 'Q'): (4, 30, 31, 30), (29, 'Q'): (1, 30, 37, 30), (30, 'Q'): (15, 30, 25, 30),
+    (31, 'Q'): (42, 30, 1, 30), (32, 'Q'): (10, 30, 35, 30), (33, 'Q'): (29, 30, 19, 30),
+    (34, 'Q'): (44, 30, 7, 30), (35, 'Q'): (39, 30, 14, 30), (36, 'Q'): (46, 30, 10, 30),
+    (37, 'Q'): (49, 30, 10, 30), (38, 'Q'): (48, 30, 14, 30), (39, 'Q'): (43, 30, 22, 30),
+    (40, 'Q'): (34, 30, 34, 30),
     
     # Level H (30% recovery)
-    (1, 'H'): (1, 17, 0, 0), (2, 'H'): (1, 28, 1, 28), (3, 'H'): (2, 22, 2, 22),
-    (4, 'H'): (4, 16, 4, 16), (5, 'H'): (4, 18, 4, 18), (6, 'H'): (4, 24, 4, 24),
-    (7, 'H'): (4, 18, 4, 18), (8, 'H'): (4, 22, 4, 22), (9, 'H'): (4, 20, 4, 20),
-    (10, 'H'): (4, 24, 4, 24), (11, 'H'): (4, 28, 4, 28), (12, 'H'): (4, 26, 4, 26),
-    (13, 'H'): (4, 24, 4, 24), (14, 'H'): (4, 20, 4, 20), (15, 'H'): (6, 24, 4, 24),
-    (16, 'H'): (6, 28, 4, 28), (17, 'H'): (6, 24, 4, 24), (18, 'H'): (6, 28, 4, 28),
-    (19, 'H'): (6, 26, 4, 26), (20, 'H'): (6, 30, 4, 30), (21, 'H'): (6, 28, 4, 28),
-    (22, 'H'): (6, 30, 4, 30), (23, 'H'): (6, 30, 4, 30), (24, 'H'): (6, 30, 4, 30),
-    (25, 'H'): (6, 30, 4, 30), (26, 'H'): (6, 30, 4, 30), (27, 'H'): (6, 30, 4, 30),
-    (28, 'H'): (6, 30, 4, 30), (29, 'H'): (6, 30, 4, 30), (30, 'H'): (6, 30, 4, 30),
-    (31, 'H'): (6, 30, 4, 30), (32, 'H'): (6, 30, 4, 30), (33, 'H'): (6, 30, 4, 30),
-    (34, 'H'): (6, 30, 4, 30), (35, 'H'): (6, 30, 4, 30), (36, 'H'): (6, 30, 4, 30),
-    (37, 'H'): (6, 30, 4, 30), (38, 'H'): (6, 30, 4, 30), (39, 'H'): (6, 30, 4, 30),
-    (40, 'H'): (6, 30, 4, 30),
+    (1, 'H'): (1, 17, 0, 0), (2, 'H'): (1, 28, 0, 0), (3, 'H'): (2, 22, 0, 0),
+    (4, 'H'): (4, 16, 0, 0), (5, 'H'): (2, 22, 2, 22), (6, 'H'): (4, 28, 0, 0),
+    (7, 'H'): (4, 26, 1, 26), (8, 'H'): (4, 26, 2, 26), (9, 'H'): (4, 24, 4, 24),
+    (10, 'H'): (6, 28, 2, 28), (11, 'H'): (3, 24, 8, 24), (12, 'H'): (7, 28, 4, 28),
+    (13, 'H'): (12, 22, 4, 22), (14, 'H'): (11, 24, 5, 24), (15, 'H'): (11, 24, 7, 24),
+    (16, 'H'): (3, 30, 13, 30), (17, 'H'): (2, 28, 17, 28), (18, 'H'): (2, 28, 19, 28),
+    (19, 'H'): (9, 26, 16, 26), (20, 'H'): (15, 28, 10, 28), (21, 'H'): (19, 30, 6, 30),
+    (22, 'H'): (34, 24, 0, 0), (23, 'H'): (16, 30, 14, 30), (24, 'H'): (30, 30, 2, 30),
+    (25, 'H'): (22, 30, 13, 30), (26, 'H'): (33, 30, 4, 30), (27, 'H'): (12, 30, 28, 30),
+    (28, 'H'): (11, 30, 31, 30), (29, 'H'): (19, 30, 26, 30), (30, 'H'): (23, 30, 25, 30),
+    (31, 'H'): (23, 30, 28, 30), (32, 'H'): (19, 30, 35, 30), (33, 'H'): (11, 30, 46, 30),
+    (34, 'H'): (59, 30, 1, 30), (35, 'H'): (22, 30, 41, 30), (36, 'H'): (2, 30, 64, 30),
+    (37, 'H'): (24, 30, 46, 30), (38, 'H'): (42, 30, 32, 30), (39, 'H'): (10, 30, 67, 30),
+    (40, 'H'): (20, 30, 61, 30),
+    
+    # Micro QR (single block; M1 only has error detection and no level)
+    ('M2', 'L'): (1, 5, 0, 0), ('M2', 'M'): (1, 6, 0, 0),
+    ('M3', 'L'): (1, 6, 0, 0), ('M3', 'M'): (1, 8, 0, 0),
+    ('M4', 'L'): (1, 8, 0, 0), ('M4', 'M'): (1, 10, 0, 0), ('M4', 'Q'): (1, 14, 0, 0),
+}
+
+
+# Total ECC codewords per (version, ecc_level), folded once at import
+_ECC_TOTALS = {
+    key: g1_blocks * ecc_per_block_g1 + g2_blocks * ecc_per_block_g2
+    for key, (g1_blocks, ecc_per_block_g1, g2_blocks, ecc_per_block_g2) in _ECC_TABLE.items()
 }
 
 
@@ -111,17 +145,10 @@ def _total_ecc_codewords(version: int, ecc_level: str) -> int:
     Returns:
         int: Total number of ECC codewords, or 0 if not found in table
     """
-    ecc = (ecc_level or 'M').upper()
-    key = (version, ecc)
-    
-    if key in _ECC_TABLE:
-        g1_blocks, ecc_per_block_g1, g2_blocks, ecc_per_block_g2 = _ECC_TABLE[key]
-        return g1_blocks * ecc_per_block_g1 + g2_blocks * ecc_per_block_g2
-    
-    return 0
+    return _ECC_TOTALS.get((version, (ecc_level or 'M').upper()), 0)
 
 
-def _data_modules_coords(size: int, func_mask: List[List[bool]]) -> List[Tuple[int, int]]:
+def _data_modules_coords(size: int, func_mask: np.ndarray, timing_col: int = 6) -> np.ndarray:
     """
     Get coordinates of non-functional modules in standard QR placement order.
     
@@ -130,39 +157,281 @@ def _data_modules_coords(size: int, func_mask: List[List[bool]]) -> List[Tuple[i
     
     Args:
         size (int): QR code size in modules
-        func_mask (List[List[bool]]): Functional area mask
+        func_mask (np.ndarray): Functional area mask
+        timing_col (int): Vertical timing column to skip (0 for Micro QR, which
+            the zigzag never reaches)
         
     Returns:
-        List[Tuple[int, int]]: List of (row, col) coordinates in placement order
+        np.ndarray: (N, 2) array of (row, col) coordinates in placement order
     """
-    coords = []
-    upward = True
+    # Right-hand column of every two-column strip, right to left
+    strip_cols = []
     col = size - 1
-    
     while col > 0:
-        if col == 6:  # Skip timing pattern column
+        if col == timing_col:  # Skip timing pattern column
             col -= 1
-            
-        for i in range(size):
-            r = (size - 1 - i) if upward else i
-            # Process pair of columns [col, col-1]
-            for c in (col, col - 1):
-                if 0 <= r < size and 0 <= c < size and not func_mask[r][c]:
-                    coords.append((r, c))
-                    
-        upward = not upward
+        strip_cols.append(col)
         col -= 2
+    strip_cols = np.array(strip_cols, dtype=np.intp)
+    
+    # Strips alternate upward/downward; each row visits [col, col-1]
+    steps = np.arange(size, dtype=np.intp)
+    upward = (np.arange(strip_cols.size) % 2 == 0)[:, None]
+    rows = np.where(upward, size - 1 - steps, steps)
+    rows = np.broadcast_to(rows[:, :, None], (strip_cols.size, size, 2)).ravel()
+    cols = np.broadcast_to((strip_cols[:, None] - np.arange(2))[:, None, :],
+                           (strip_cols.size, size, 2)).ravel()
+    
+    keep = ~np.asarray(func_mask, dtype=bool)[rows, cols]
+    return np.stack((rows[keep], cols[keep]), axis=1)
+
+
+@lru_cache(maxsize=64)
+def _version_masks(size: int, version: Union[int, str]) -> Tuple[np.ndarray, ...]:
+    """
+    Build (and memoize) every payload-independent mask used in zone coloring.
+    
+    The zone masks mirror the geometric tests used to color functional
+    modules and may overlap; callers resolve overlaps by priority (finder
+    first). All arrays are read-only because they are shared across calls.
+    
+    Args:
+        size (int): QR code size in modules
+        version (Union[int, str]): QR code version (1-40, or 'M1'-'M4')
         
-    return coords
+    Returns:
+        Tuple[np.ndarray, ...]: (func, sep, placement, finder, alignment, timing, format, version)
+            - func, sep: functional and separator masks from build_function_mask
+            - placement: (N, 2) array of data module (row, col) in placement order
+            - remaining: boolean zone masks
+    """
+    func, sep = build_function_mask(size, version)
+    
+    if is_micro_version(version):
+        masks = _micro_version_masks(size, func, sep)
+        for arr in masks:
+            arr.flags.writeable = False
+        return masks
+    
+    placement = _data_modules_coords(size, func)
+    
+    finder = np.zeros((size, size), dtype=bool)
+    for (r0, c0) in [(0, 0), (0, size - 7), (size - 7, 0)]:
+        finder[r0:r0 + 7, c0:c0 + 7] = True
+    
+    alignment = np.zeros((size, size), dtype=bool)
+    centers = compute_alignment_centers(version)
+    for cy in centers:
+        for cx in centers:
+            # No alignment pattern where it would overlap a finder pattern
+            if finder[cy, cx]:
+                continue
+            alignment[cy - 2:cy + 3, cx - 2:cx + 3] = True
+    
+    timing = np.zeros((size, size), dtype=bool)
+    timing[6, :] = True
+    timing[:, 6] = True
+    
+    fmt = np.zeros((size, size), dtype=bool)
+    fmt[8, :] = True
+    fmt[:, 8] = True
+    fmt[:9, :9] = True
+    fmt[:9, size - 8:] = True
+    
+    ver = np.zeros((size, size), dtype=bool)
+    if version >= 7:
+        ver[:6, size - 11:] = True
+        ver[size - 11:, :6] = True
+    
+    masks = (func, sep, placement, finder, alignment, timing, fmt, ver)
+    for arr in masks:
+        arr.flags.writeable = False
+    return masks
 
 
-def render_colored_png_from_matrix(
-    matrix: List[List[bool]],
+def _micro_version_masks(size: int, func: np.ndarray, sep: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Micro QR counterpart of the zone masks built by _version_masks.
+    
+    One finder, timing along row 0 / column 0, one format area, no alignment
+    and no version information.
+    """
+    placement = _data_modules_coords(size, func, timing_col=0)
+    
+    finder = np.zeros((size, size), dtype=bool)
+    finder[:7, :7] = True
+    
+    timing = np.zeros((size, size), dtype=bool)
+    timing[0, :] = True
+    timing[:, 0] = True
+    
+    fmt = np.zeros((size, size), dtype=bool)
+    fmt[8, 1:9] = True
+    fmt[1:8, 8] = True
+    
+    empty = np.zeros((size, size), dtype=bool)
+    return (func, sep, placement, finder, empty, timing, fmt, empty)
+
+
+def _matrix_to_array(matrix: Matrix) -> np.ndarray:
+    """
+    Convert a QR matrix to a boolean ndarray without per-cell iteration.
+    
+    2-D ndarrays are used as they are (no copy if already boolean). segno
+    exposes rows as bytearrays of 0/1, which can be joined and viewed in a
+    single copy; any other row type falls back to np.asarray.
+    
+    Args:
+        matrix (Matrix): QR code matrix (True=dark, False=light)
+        
+    Returns:
+        np.ndarray: Boolean array of shape (size, size)
+    """
+    if isinstance(matrix, np.ndarray):
+        return matrix if matrix.dtype == np.bool_ else matrix != 0
+    rows = matrix if isinstance(matrix, (list, tuple)) else list(matrix)
+    if rows and all(isinstance(row, (bytes, bytearray)) for row in rows):
+        flat = np.frombuffer(b''.join(rows), dtype=np.uint8)
+        return flat.reshape(len(rows), -1) != 0
+    return np.asarray(rows, dtype=bool)
+
+
+@lru_cache(maxsize=128)
+def _zone_map(size: int, version: int, ecc: str) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    Precompute (and memoize) the zone code of every module for a version/ECC.
+    
+    Zones depend only on geometry and the ECC level, never on the payload,
+    so a render reduces to picking, per module, the dark or the light code.
+    Dark modules take the zone of the highest-priority region they fall in
+    (finder > alignment > timing > format > version > data > ECC); light
+    modules are either separator or background.
+    
+    Args:
+        size (int): QR code size in modules
+        version (int): QR code version (1-40)
+        ecc (str): Error correction level for ECC zone calculation
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray, int, int]:
+            (dark_zone, light_zone, functional_count, data_modules_est); both
+            arrays are read-only uint8 ``_ZONE_*`` codes, shape (size, size)
+    """
+    # Payload-independent masks are shared by every render of this version
+    func, sep, placement, finder_m, align_m, timing_m, fmt_m, ver_m = _version_masks(size, version)
+    
+    # Calculate basic metrics
+    total_modules = size * size
+    functional_count = int(np.count_nonzero(func))
+    data_modules_est = total_modules - functional_count
+    
+    # Determine data vs ECC module positions
+    total_cw_est = data_modules_est // 8
+    ecc_cw_total = _total_ecc_codewords(version, ecc)
+    data_cw = max(0, total_cw_est - ecc_cw_total)
+    data_bits = data_cw * 8
+    
+    # Modules considered 'data' (first bits placed)
+    data_area = np.zeros((size, size), dtype=bool)
+    placed = placement[:data_bits]
+    data_area[placed[:, 0], placed[:, 1]] = True
+    
+    # If no ECC table entry, paint everything as data (safe fallback)
+    payload_zone = _ZONE_ECC if ecc_cw_total > 0 else _ZONE_DATA
+    
+    # Fused priority chain over all modules at once
+    dark_zone = np.select(
+        [func & finder_m, func & align_m, func & timing_m, func & fmt_m, func & ver_m, data_area],
+        [_ZONE_FINDER, _ZONE_ALIGNMENT, _ZONE_TIMING, _ZONE_FORMAT, _ZONE_VERSION, _ZONE_DATA],
+        default=payload_zone
+    ).astype(np.uint8)
+    light_zone = np.where(sep, _ZONE_SEPARATOR, _ZONE_BACKGROUND).astype(np.uint8)
+    
+    dark_zone.flags.writeable = False
+    light_zone.flags.writeable = False
+    return dark_zone, light_zone, functional_count, data_modules_est
+
+
+def _classify_modules(matrix: Matrix, version: int, ecc: str) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Classify every module of a QR matrix into a zone code in one vectorized pass.
+    
+    The zone layout comes from the memoized _zone_map; only the dark/light
+    selection depends on the matrix itself.
+    
+    Args:
+        matrix (Matrix): QR code matrix (True=dark, False=light), as rows or a 2-D ndarray
+        version (int): QR code version (1-40)
+        ecc (str): Error correction level for ECC zone calculation
+        
+    Returns:
+        Tuple[np.ndarray, Dict[str, int]]: (classes, counts)
+            - classes: uint8 array of ``_ZONE_*`` codes, shape (size, size)
+            - counts: size, modules, dark_modules, functional_modules, data_modules_est
+    """
+    dark = _matrix_to_array(matrix)
+    size = dark.shape[0]
+    dark_zone, light_zone, functional_count, data_modules_est = _zone_map(size, version, ecc)
+    classes = np.where(dark, dark_zone, light_zone)
+    
+    return classes, {
+        'size': size,
+        'modules': size * size,
+        'dark_modules': int(np.count_nonzero(dark)),
+        'functional_modules': functional_count,
+        'data_modules_est': data_modules_est,
+    }
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    """
+    Serialize one PNG chunk (length, tag, payload, CRC32).
+    """
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def _encode_indexed_png(pixels: np.ndarray, palette: np.ndarray, level: int = 1) -> bytes:
+    """
+    Encode an 8-bit palette-indexed image as PNG without going through Pillow.
+    
+    Every scanline uses filter type 2 (Up). The zone images are upscaled
+    modules, so all but the first row of each block repeats the row above and
+    filters to zeros; no per-row filter heuristic (as in PIL) is needed.
+    
+    Args:
+        pixels (np.ndarray): uint8 array (height, width) of palette indices
+        palette (np.ndarray): uint8 array (n_colors, 3) of RGB entries
+        level (int): zlib compression level (0-9)
+        
+    Returns:
+        bytes: Complete PNG file
+    """
+    height, width = pixels.shape
+    # Bit depth 8, color type 3 (indexed), default compression/filter, no interlace
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)
+    scanlines = np.empty((height, width + 1), dtype=np.uint8)
+    scanlines[:, 0] = 2
+    scanlines[:, 1:] = pixels
+    # Up filter: difference with the previous row (modulo 256); the first row
+    # is relative to an implicit all-zero row and stays unchanged
+    scanlines[1:, 1:] -= pixels[:-1]
+    return b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', ihdr),
+        _png_chunk(b'PLTE', palette.tobytes()),
+        _png_chunk(b'IDAT', zlib.compress(scanlines.tobytes(), level)),
+        _png_chunk(b'IEND', b''),
+    ))
+
+
+def render_colored_png_bytes_from_matrix(
+    matrix: Matrix,
     version: int,
     border: int = 4,
     scale: int = 6,
-    ecc: str = 'M'
-) -> Tuple[str, Dict[str, Any]]:
+    ecc: str = 'M',
+    fast_png: bool = False
+) -> Tuple[bytes, Dict[str, Any]]:
     """
     Render QR code matrix as colored PNG with zone-based analysis.
     
@@ -170,12 +439,68 @@ def render_colored_png_from_matrix(
     differently to help understand the structure. It distinguishes between
     functional areas (finder patterns, timing, etc.) and data areas (payload vs ECC).
     
+    Every module is classified in a single vectorized pass into a zone code
+    (see ``_classify_modules``), which doubles as the PNG palette index.
+    
     Args:
-        matrix (List[List[bool]]): QR code matrix (True=dark, False=light)
+        matrix (Matrix): QR code matrix (True=dark, False=light), as rows or a 2-D ndarray
         version (int): QR code version (1-40)
         border (int): Quiet zone size in modules (recommended: 4+)
         scale (int): Pixel size per module
         ecc (str): Error correction level for ECC zone calculation
+        fast_png (bool): Store the image data uncompressed (zlib level 0);
+            several times faster to encode but larger, for transports that
+            compress anyway
+        
+    Returns:
+        Tuple[bytes, Dict[str, Any]]: (png_bytes, metrics_dict)
+            - png_bytes: Encoded PNG image
+            - metrics_dict: Contains size, module counts, etc.
+            
+    Example:
+        >>> matrix = [[True, False, True], [False, True, False], [True, False, True]]
+        >>> png, metrics = render_colored_png_bytes_from_matrix(matrix, version=1, ecc='M')
+        >>> with open('qr_colored.png', 'wb') as f:
+        ...     f.write(png)
+    """
+    classes, counts = _classify_modules(matrix, version, ecc)
+    size = counts['size']
+    
+    # Write each module as a scale x scale block of zone codes straight into a
+    # single preallocated canvas (quiet zone included)
+    img_px = (size + 2 * border) * scale
+    canvas = np.full((img_px, img_px), _ZONE_BACKGROUND, dtype=np.uint8)
+    off = border * scale
+    blocks = canvas[off:off + size * scale, off:off + size * scale].reshape(size, scale, size, scale)
+    blocks[...] = classes[:, None, :, None]
+    
+    # Zone codes double as palette indices: emit a palette-indexed PNG
+    png = _encode_indexed_png(canvas, _PALETTE_LUT, level=0 if fast_png else 1)
+    
+    return png, dict(counts, border=border)
+
+
+def render_colored_png_from_matrix(
+    matrix: Matrix,
+    version: int,
+    border: int = 4,
+    scale: int = 6,
+    ecc: str = 'M',
+    fast_png: bool = False
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Render QR code matrix as colored PNG and return it base64-encoded.
+    
+    Convenience wrapper around render_colored_png_bytes_from_matrix for
+    embedding the image as a data URI.
+    
+    Args:
+        matrix (Matrix): QR code matrix (True=dark, False=light), as rows or a 2-D ndarray
+        version (int): QR code version (1-40)
+        border (int): Quiet zone size in modules (recommended: 4+)
+        scale (int): Pixel size per module
+        ecc (str): Error correction level for ECC zone calculation
+        fast_png (bool): Skip zlib compression of the image data
         
     Returns:
         Tuple[str, Dict[str, Any]]: (base64_png, metrics_dict)
@@ -187,122 +512,40 @@ def render_colored_png_from_matrix(
         >>> b64, metrics = render_colored_png_from_matrix(matrix, version=1, ecc='M')
         >>> print(f"Generated {metrics['size']}x{metrics['size']} QR code")
     """
-    rows = list(matrix)
-    size = len(rows)
-    
-    # Build functional area masks
-    func_mask, sep_mask = build_function_mask(size, version)
-    
-    # Calculate basic metrics
-    total_modules = size * size
-    functional_count = sum(sum(1 for c in row if c) for row in func_mask)
-    data_modules_est = total_modules - functional_count
+    png, metrics = render_colored_png_bytes_from_matrix(
+        matrix, version, border=border, scale=scale, ecc=ecc, fast_png=fast_png
+    )
+    return base64.b64encode(png).decode('ascii'), metrics
+
+
+def _zone_runs(classes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split every row of a zone-code grid into runs of equal codes.
     
-    # Determine data vs ECC module positions
-    coords = _data_modules_coords(size, func_mask)
-    total_cw_est = data_modules_est // 8
-    ecc_cw_total = _total_ecc_codewords(version, ecc)
-    data_cw = max(0, total_cw_est - ecc_cw_total)
-    data_bits = data_cw * 8
+    Args:
+        classes (np.ndarray): uint8 zone codes, shape (size, size)
+        
+    Returns:
+        Tuple[np.ndarray, ...]: (rows, cols, lengths, zones) of each run in
+        row-major order
+    """
+    size = classes.shape[0]
+    # A sentinel column (not a zone code) ends every row's last run
+    padded = np.full((size, size + 1), 0xFF, dtype=np.uint8)
+    padded[:, :size] = classes
+    flat = padded.ravel()
     
-    # Set of positions considered 'data' (first bits placed)
-    data_positions = set(coords[:data_bits])
+    starts = np.flatnonzero(np.concatenate(([True], flat[1:] != flat[:-1])))
+    lengths = np.diff(np.append(starts, flat.size))
+    zones = flat[starts]
     
-    # Create output image
-    img_px = (size + 2 * border) * scale
-    img = Image.new('RGB', (img_px, img_px), PALETTE['background'])
-    draw = ImageDraw.Draw(img)
-    
-    dark_modules = 0
-    
-    # Pre-calculate positions for efficiency
-    finder_positions = [(0, 0), (0, size - 7), (size - 7, 0)]
-    alignment_centers = compute_alignment_centers(version)
-    
-    # Render each module
-    for r in range(size):
-        for c in range(size):
-            is_dark = bool(rows[r][c])
-            x0 = (c + border) * scale
-            y0 = (r + border) * scale
-            x1 = x0 + scale - 1
-            y1 = y0 + scale - 1
-            
-            # Draw separator zones (light gray where module is light)
-            if sep_mask[r][c] and not is_dark:
-                draw.rectangle([x0, y0, x1, y1], fill=PALETTE['separator'])
-                continue
-                
-            if not is_dark:
-                continue
-                
-            dark_modules += 1
-            
-            # Color functional areas
-            if func_mask[r][c]:
-                # Finder patterns (purple)
-                in_finder = False
-                for (r0, c0) in finder_positions:
-                    if r0 <= r < r0 + 7 and c0 <= c < c0 + 7:
-                        draw.rectangle([x0, y0, x1, y1], fill=PALETTE['finder'])
-                        in_finder = True
-                        break
-                if in_finder:
-                    continue
-                
-                # Alignment patterns (teal)
-                aligned = False
-                for cy in alignment_centers:
-                    for cx in alignment_centers:
-                        if (cy - 2) <= r <= (cy + 2) and (cx - 2) <= c <= (cx + 2):
-                            draw.rectangle([x0, y0, x1, y1], fill=PALETTE['alignment'])
-                            aligned = True
-                            break
-                    if aligned:
-                        break
-                if aligned:
-                    continue
-                
-                # Timing patterns (orange)
-                if r == 6 or c == 6:
-                    draw.rectangle([x0, y0, x1, y1], fill=PALETTE['timing'])
-                    continue
-                
-                # Format information (red)
-                if (r == 8 or c == 8) or (r < 9 and c < 9) or (c >= size - 8 and r < 9):
-                    draw.rectangle([x0, y0, x1, y1], fill=PALETTE['format'])
-                    continue
-                
-                # Version information (dark red, v≥7)
-                if version >= 7 and ((r < 6 and c >= size - 11) or (r >= size - 11 and c < 6)):
-                    draw.rectangle([x0, y0, x1, y1], fill=PALETTE['version'])
-                    continue
-            
-            # Color non-functional areas: data vs ECC
-            if (r, c) in data_positions:
-                fill = PALETTE['data']
-            else:
-                # If no ECC table entry, paint everything as data (safe fallback)
-                fill = PALETTE['ecc'] if ecc_cw_total > 0 else PALETTE['data']
-            draw.rectangle([x0, y0, x1, y1], fill=fill)
-    
-    # Encode PNG to base64
-    buf = BytesIO()
-    img.save(buf, format='PNG')
-    b64 = base64.b64encode(buf.getvalue()).decode('ascii')
-    
-    return b64, {
-        'size': size,
-        'modules': total_modules,
-        'dark_modules': dark_modules,
-        'functional_modules': functional_count,
-        'data_modules_est': data_modules_est,
-        'border': border
-    }
+    real = zones != 0xFF
+    rows, cols = np.divmod(starts[real], size + 1)
+    return rows, cols, lengths[real], zones[real]
 
 
 def render_colored_svg_from_matrix(
-    matrix: List[List[bool]],
+    matrix: Matrix,
     version: int,
     border: int = 4,
     scale: int = 10,
@@ -315,7 +558,7 @@ def render_colored_svg_from_matrix(
     scalable vector graphics. Useful for high-quality printing and web display.
     
     Args:
-        matrix (List[List[bool]]): QR code matrix (True=dark, False=light)
+        matrix (Matrix): QR code matrix (True=dark, False=light), as rows or a 2-D ndarray
         version (int): QR code version (1-40)
         border (int): Quiet zone size in modules
         scale (int): Pixel size per module
@@ -330,92 +573,30 @@ def render_colored_svg_from_matrix(
         >>> with open('qr_colored.svg', 'wb') as f:
         ...     f.write(svg_bytes)
     """
-    rows = list(matrix)
-    size = len(rows)
-    
-    # Build functional area masks
-    func_mask, sep_mask = build_function_mask(size, version)
-    
-    # Calculate data vs ECC positions
-    total_modules = size * size
-    functional_count = sum(sum(1 for c in row if c) for row in func_mask)
-    data_modules_est = total_modules - functional_count
-    
-    coords = _data_modules_coords(size, func_mask)
-    total_cw_est = data_modules_est // 8
-    ecc_cw_total = _total_ecc_codewords(version, ecc)
-    data_cw = max(0, total_cw_est - ecc_cw_total)
-    data_bits = data_cw * 8
-    data_positions = set(coords[:data_bits])
+    classes, counts = _classify_modules(matrix, version, ecc)
+    size = counts['size']
     
     # SVG header
     size_mod = size + 2 * border
     px = size_mod * scale
-    out = []
-    out.append('<?xml version="1.0" encoding="UTF-8"?>')
-    out.append(f'<svg xmlns="http://www.w3.org/2000/svg" width="{px}" height="{px}" viewBox="0 0 {px} {px}">')
-    out.append(f'<rect width="{px}" height="{px}" fill="rgb{PALETTE["background"]}"/>')
-    
-    # Pre-calculate positions
-    finder_positions = [(0, 0), (0, size - 7), (size - 7, 0)]
-    alignment_centers = compute_alignment_centers(version)
-    
-    # Draw separators (where module is light)
-    for r in range(size):
-        for c in range(size):
-            if sep_mask[r][c] and not rows[r][c]:
-                x = (c + border) * scale
-                y = (r + border) * scale
-                out.append(f'<rect x="{x}" y="{y}" width="{scale}" height="{scale}" fill="rgb{PALETTE["separator"]}"/>')
-    
-    # Draw dark modules with zone coloring
-    for r in range(size):
-        for c in range(size):
-            if not rows[r][c]:
-                continue
-                
-            # Determine color based on functional area
-            fill = None
-            if func_mask[r][c]:
-                # Finder patterns
-                for (r0, c0) in finder_positions:
-                    if r0 <= r < r0 + 7 and c0 <= c < c0 + 7:
-                        fill = PALETTE['finder']
-                        break
-                if fill is None:
-                    # Alignment patterns
-                    aligned = False
-                    for cy in alignment_centers:
-                        for cx in alignment_centers:
-                            if (cy - 2) <= r <= (cy + 2) and (cx - 2) <= c <= (cx + 2):
-                                fill = PALETTE['alignment']
-                                aligned = True
-                                break
-                        if aligned:
-                            break
-                if fill is None:
-                    # Timing patterns
-                    if r == 6 or c == 6:
-                        fill = PALETTE['timing']
-                if fill is None:
-                    # Format information
-                    if (r == 8 or c == 8) or (r < 9 and c < 9) or (c >= size - 8 and r < 9):
-                        fill = PALETTE['format']
-                if fill is None and version >= 7:
-                    # Version information
-                    if (r < 6 and c >= size - 11) or (r >= size - 11 and c < 6):
-                        fill = PALETTE['version']
-                if fill is None:
-                    # Fallback to data color
-                    fill = PALETTE['data']
-            else:
-                # Non-functional: data vs ECC
-                fill = PALETTE['data'] if (r, c) in data_positions else (PALETTE['ecc'] if ecc_cw_total > 0 else PALETTE['data'])
-            
-            # Draw the rectangle
-            x = (c + border) * scale
-            y = (r + border) * scale
-            out.append(f'<rect x="{x}" y="{y}" width="{scale}" height="{scale}" fill="rgb{fill}"/>')
+    buf = io.StringIO()
+    write = buf.write
+    write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{px}" height="{px}" viewBox="0 0 {px} {px}">\n')
+    write(f'<rect width="{px}" height="{px}" fill="{_SVG_FILLS[_ZONE_BACKGROUND]}"/>\n')
+    
+    # One rect per horizontal run of equal zone, separators first (light),
+    # then dark modules with zone coloring
+    fills = _SVG_FILLS
+    run_rows, run_cols, run_lengths, run_zones = _zone_runs(classes)
+    xs = ((run_cols + border) * scale).tolist()
+    ys = ((run_rows + border) * scale).tolist()
+    widths = (run_lengths * scale).tolist()
+    zones = run_zones.tolist()
+    order = np.concatenate((np.flatnonzero(run_zones == _ZONE_SEPARATOR),
+                            np.flatnonzero(run_zones >= _ZONE_FINDER))).tolist()
+    for i in order:
+        write(f'<rect x="{xs[i]}" y="{ys[i]}" width="{widths[i]}" height="{scale}" fill="{fills[zones[i]]}"/>\n')
     
-    out.append('</svg>')
-    return "\n".join(out).encode("utf-8")
+    write('</svg>')
+    return buf.getvalue().encode("utf-8")
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the Flask request parsing in app.py.
+
+Run with ``python -m unittest discover tests`` (or pytest).
+"""
+
+import unittest
+
+import app as qr_app
+
+
+class ReadParamsEciDefaultTest(unittest.TestCase):
+    """A missing eci field keeps its historical default per request method."""
+
+    def _eci(self, method, **values):
+        with qr_app.app.test_request_context('/', method=method, data=values if method == 'POST' else None,
+                                             query_string=values if method == 'GET' else None):
+            return qr_app._read_params(qr_app.request)[5]
+
+    def test_post_without_eci_is_false(self):
+        self.assertIs(self._eci('POST', text='hola'), False)
+
+    def test_get_without_eci_is_true(self):
+        self.assertIs(self._eci('GET', text='hola'), True)
+
+    def test_explicit_eci_wins(self):
+        self.assertIs(self._eci('POST', text='hola', eci='true'), True)
+        self.assertIs(self._eci('GET', text='hola', eci='false'), False)
+
+    def test_post_without_eci_encodes_without_eci(self):
+        client = qr_app.app.test_client()
+        html = client.post('/', data={'text': 'hola'}).get_data(as_text=True)
+        self.assertIn('eci=false', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for core.qr_generator mask evaluation.
+
+Run with ``python -m unittest discover tests`` (or pytest).
+"""
+
+import unittest
+
+import segno
+
+from core.qr_generator import evaluate_all_masks, make_qr
+
+
+class MicroMaskEvaluationTest(unittest.TestCase):
+    """Micro QR masks are chosen by the ISO/IEC 18004 SUM1/SUM2 rule."""
+
+    CASES = [
+        # (text, ecc, version, mode)
+        ('12', 'M', 'M3', 'byte'),
+        ('12345', 'M', 'M2', None),
+        ('HELLO', 'L', 'M2', None),
+        ('1', 'M', 'M2', None),
+        ('12345', None, 'M1', 'numeric'),
+        ('ABC123', 'Q', 'M4', None),
+        ('hello', 'M', None, 'byte'),
+    ]
+
+    def test_best_mask_matches_segno(self):
+        for text, ecc, version, mode in self.CASES:
+            with self.subTest(text=text, ecc=ecc, version=version, mode=mode):
+                expected = segno.make(text, error=ecc, version=version, mode=mode,
+                                      eci=False, boost_error=False, micro=True).mask
+                best_mask, _, scores = evaluate_all_masks(
+                    text, ecc=ecc, version=version, mode=mode, encoding='utf-8',
+                    eci=False, boost_error=False, micro=True
+                )
+                self.assertEqual(best_mask, expected)
+                self.assertEqual(sorted(scores), [0, 1, 2, 3])
+
+    def test_auto_mask_symbol_agrees(self):
+        best_mask, _, _ = evaluate_all_masks(
+            'HELLO', ecc='L', version='M2', mode=None, encoding='utf-8',
+            eci=False, boost_error=False, micro=True
+        )
+        symbol = make_qr('HELLO', ecc='L', version='M2', mode=None, eci=False,
+                         mask='auto', micro=True)
+        self.assertEqual(best_mask, symbol.mask)
+
+
+if __name__ == '__main__':
+    unittest.main()